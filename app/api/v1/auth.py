@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.dependencies import DBSession, CurrentUser
-from app.services.user import UserService
+from app.dependencies import UserSvc, CurrentUser
 from app.schemas.user import Token, UserCreate, UserResponse
 from app.core.security import create_access_token, create_refresh_token, verify_token
 from app.core.exceptions import UnauthorizedException, BadRequestException
@@ -13,21 +12,19 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/register", response_model=UserResponse)
 async def register(
         user_in: UserCreate,
-        db: DBSession
+        user_service: UserSvc
 ):
     """用户注册"""
-    user_service = UserService(db)
     user = await user_service.create(user_in)
     return user
 
 
 @router.post("/login", response_model=Token)
 async def login(
-        db: DBSession,
+        user_service: UserSvc,  # 登录时可能升级密码哈希
         form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """用户登录"""
-    user_service = UserService(db)
     user = await user_service.authenticate(
         username=form_data.username,
         password=form_data.password
@@ -47,7 +44,7 @@ async def login(
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
-        db: DBSession,
+        user_service: UserSvc,
         refresh_token: str
 ):
     """刷新令牌"""
@@ -56,7 +53,6 @@ async def refresh_token(
     if not token_data or token_data.type != "refresh":
         raise BadRequestException("Invalid refresh token")
 
-    user_service = UserService(db)
     user = await user_service.get_by_id(token_data.sub)
 
     if not user or not user.is_active:
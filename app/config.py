@@ -4,6 +4,7 @@
 使用 Pydantic Settings V2 管理配置
 """
 
+import os
 from functools import lru_cache
 from pathlib import Path
 from typing import Annotated, Self
@@ -42,6 +43,7 @@ class Settings(BaseSettings):
     PORT: int = 8000
     WORKERS: int = 1
     RELOAD: bool = True
+    THREADPOOL_SIZE: int = 100  # 通用线程池容量（同步依赖等，密码哈希另有独立限额）
 
     # ============ 安全 ============
     SECRET_KEY: SecretStr = Field(
@@ -50,13 +52,23 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Argon2id 参数 (OWASP 推荐: 64 MiB, t=3, p=2)
+    ARGON2_TIME_COST: Annotated[int, Field(ge=1)] = 3
+    ARGON2_MEMORY_COST: Annotated[int, Field(ge=8)] = 65536  # KiB
+    ARGON2_PARALLELISM: Annotated[int, Field(ge=1)] = 2
+    # 同时进行的密码哈希/验证数，每个占用 ARGON2_MEMORY_COST 内存，默认等于 CPU 核数
+    PASSWORD_HASH_CONCURRENCY: Annotated[int, Field(ge=1)] = os.cpu_count() or 1
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 60  # 秒
 
     # ============ 数据库 ============
     DATABASE_URL: str = f"sqlite+aiosqlite:///{BASE_DIR}/data/app.db"
     DATABASE_ECHO: bool = False
-    DATABASE_POOL_SIZE: int = 5
-    DATABASE_MAX_OVERFLOW: int = 10
-    DATABASE_POOL_RECYCLE: int = 3600
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: int = 30  # 秒
+    DATABASE_POOL_RECYCLE: int = 1800  # 秒
+    SQLITE_POOL_SIZE: int = 8
 
     # ============ 超级管理员 ============
     FIRST_SUPERUSER_EMAIL: str = "admin@example.com"
@@ -69,6 +81,10 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_ENABLED: bool = False
 
+    # ============ 缓存 ============
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 30  # 秒
+
     # ============ CORS ============
     CORS_ORIGINS: list[str] = [
         "http://localhost:3000",
@@ -4,19 +4,49 @@
 JWT Token 和密码处理
 """
 
-from datetime import datetime, timedelta, timezone
-
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from typing import TypeVar, TypeVarTuple
+
+import anyio
+import anyio.to_thread
+import bcrypt
+import jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from jwt import InvalidTokenError
 
 from app.config import settings
+from app.core.cache import TTLCache
 from app.schemas.user import TokenPayload
 
-# 密码上下文
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=12,
+# settings 为单例，签名参数在导入时绑定一次
+_SECRET_KEY = settings.secret_key_value
+_ALGORITHM = settings.ALGORITHM
+_ALGORITHMS = [_ALGORITHM]
+
+# 密码哈希器 (Argon2id)
+_password_hasher = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+    hash_len=32,
+    salt_len=16,
+)
+_BCRYPT_PREFIX = "$2"
+
+# 密码哈希专用线程限额：每次 Argon2 运算都要分配 ARGON2_MEMORY_COST 内存，
+# 不与通用线程池共享，突发登录时内存占用不会随通用线程数增长
+_hash_limiter = anyio.CapacityLimiter(settings.PASSWORD_HASH_CONCURRENCY)
+
+T = TypeVar("T")
+Ts = TypeVarTuple("Ts")
+
+# 已验证 Token 缓存，避免同一 Token 重复解码验签
+_token_cache: TTLCache[str, TokenPayload] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL,
 )
 
 
@@ -26,20 +56,19 @@ def create_token(
         expires_delta: timedelta,
 ) -> str:
     """创建 JWT Token"""
-    now = datetime.now(timezone.utc)
-    expire = now + expires_delta
+    now = int(time.time())
 
     payload = {
         "sub": str(subject),
         "type": token_type,
-        "iat": int(now.timestamp()),
-        "exp": int(expire.timestamp()),
+        "iat": now,
+        "exp": now + int(expires_delta.total_seconds()),
     }
 
     return jwt.encode(
         payload,
-        settings.secret_key_value,
-        algorithm=settings.ALGORITHM,
+        _SECRET_KEY,
+        algorithm=_ALGORITHM,
     )
 
 
@@ -63,27 +92,55 @@ def create_refresh_token(subject: int | str) -> str:
 
 def verify_token(token: str) -> TokenPayload | None:
     """验证 Token"""
+    cached = _token_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(
             token,
-            settings.secret_key_value,
-            algorithms=[settings.ALGORITHM],
+            _SECRET_KEY,
+            algorithms=_ALGORITHMS,
         )
-        return TokenPayload(
+        token_data = TokenPayload(
             sub=int(payload["sub"]),
             type=payload["type"],
-            iat=datetime.fromtimestamp(payload["iat"], tz=timezone.utc),
-            exp=datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
+            iat=payload["iat"],
+            exp=payload["exp"],
         )
-    except (JWTError, KeyError, ValueError):
+    except (InvalidTokenError, KeyError, ValueError):
         return None
 
+    # 缓存时间不超过 Token 剩余有效期
+    remaining = token_data.exp - time.time()
+    if remaining > 0:
+        _token_cache.set(token, token_data, ttl=min(remaining, settings.TOKEN_CACHE_TTL))
+    return token_data
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码"""
-    return pwd_context.verify(plain_password, hashed_password)
+    # 兼容迁移前的 bcrypt 哈希
+    if hashed_password.startswith(_BCRYPT_PREFIX):
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+    try:
+        return _password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """判断密码哈希是否需要升级（bcrypt 旧哈希或 Argon2 参数已变更）"""
+    if hashed_password.startswith(_BCRYPT_PREFIX):
+        return True
+    return _password_hasher.check_needs_rehash(hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """获取密码哈希"""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return _password_hasher.hash(password)
+
+
+async def run_in_hash_threadpool(func: Callable[[*Ts], T], *args: *Ts) -> T:
+    """在密码哈希专用的线程限额内执行哈希/验证"""
+    return await anyio.to_thread.run_sync(func, *args, limiter=_hash_limiter)
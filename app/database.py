@@ -4,10 +4,14 @@
 SQLAlchemy 2.0+ 异步数据库连接管理
 """
 
-from collections.abc import AsyncGenerator
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from functools import cache
+from operator import attrgetter
 from pathlib import Path
 
-from sqlalchemy import MetaData, text
+from sqlalchemy import MetaData, event, make_url, text
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
     AsyncEngine,
@@ -15,7 +19,9 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session, UOWTransaction
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
 
 from app.config import settings
 
@@ -28,15 +34,78 @@ NAMING_CONVENTION: dict[str, str] = {
     "pk": "pk_%(table_name)s",
 }
 
+# SQLite 连接参数: WAL 允许读写并发，NORMAL 在 WAL 下减少 fsync
+SQLITE_PRAGMAS: tuple[str, ...] = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+)
+
+
+def _set_sqlite_pragmas(
+        dbapi_connection: DBAPIConnection,
+        connection_record: ConnectionPoolEntry,  # noqa: ARG001
+) -> None:
+    """新建 SQLite 连接时设置 PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+# 会话 info 中的写入标记：事务内执行过 INSERT/UPDATE/DELETE 或 flush 时置位
+_HAS_WRITES = "has_writes"
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_writes(orm_execute_state: ORMExecuteState) -> None:
+    """记录通过 Session.execute 发出的写语句"""
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[_HAS_WRITES] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush_writes(session: Session, flush_context: UOWTransaction) -> None:  # noqa: ARG001
+    """记录 flush 产生的写入"""
+    session.info[_HAS_WRITES] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _reset_writes(session: Session) -> None:
+    """事务结束后清除写入标记"""
+    session.info.pop(_HAS_WRITES, None)
+
+
+def _is_sqlite_file_db(url: str) -> bool:
+    """判断是否为 SQLite 文件数据库（排除 sqlite://、:memory: 及 mode=memory 的 URI）"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return False
+    if parsed.database in (None, "", ":memory:"):
+        return False
+    return parsed.query.get("mode") != "memory"
+
 
 class Base(AsyncAttrs, DeclarativeBase):
     """SQLAlchemy 声明式基类"""
 
     metadata = MetaData(naming_convention=NAMING_CONVENTION)
 
+    @classmethod
+    @cache
+    def _column_names(cls) -> tuple[str, ...]:
+        """列名元组（每个模型类只计算一次）"""
+        return tuple(c.name for c in cls.__table__.columns)
+
     def to_dict(self) -> dict:
         """转换为字典"""
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+        names = self._column_names()
+        values = attrgetter(*names)(self)
+        # 单列时 attrgetter 直接返回值而非元组
+        return dict(zip(names, values if len(names) > 1 else (values,), strict=True))
 
 
 class DatabaseManager:
@@ -61,11 +130,11 @@ class DatabaseManager:
     def init(self, database_url: str | None = None) -> None:
         """初始化数据库连接"""
         url = database_url or settings.DATABASE_URL
+        sqlite_file = _is_sqlite_file_db(url)
 
-        # SQLite 需要确保目录存在
-        if url.startswith("sqlite"):
-            db_path = url.split("///")[-1]
-            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # SQLite 文件数据库需要确保目录存在
+        if sqlite_file:
+            Path(make_url(url).database or "").parent.mkdir(parents=True, exist_ok=True)
 
         # 引擎配置
         engine_kwargs: dict = {
@@ -74,16 +143,32 @@ class DatabaseManager:
             "pool_pre_ping": True,
         }
 
-        # 非 SQLite 连接池配置
-        if not url.startswith("sqlite"):
+        if url.startswith("sqlite"):
+            # aiosqlite 对文件数据库默认使用 NullPool，每次请求都要新建连接线程
+            # 改为队列池复用连接，保持 SQLite 页缓存常驻；
+            # 内存数据库每个连接各自独立，保留方言默认的单连接池
+            if sqlite_file:
+                engine_kwargs.update({
+                    "poolclass": AsyncAdaptedQueuePool,
+                    "pool_size": settings.SQLITE_POOL_SIZE,
+                    "max_overflow": 0,
+                    "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+                })
+        else:
+            # 显式使用队列池，避免驱动/方言默认值变化导致退化为 NullPool
             engine_kwargs.update({
+                "poolclass": AsyncAdaptedQueuePool,
                 "pool_size": settings.DATABASE_POOL_SIZE,
                 "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+                "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
                 "pool_recycle": settings.DATABASE_POOL_RECYCLE,
             })
 
         self._engine = create_async_engine(url, **engine_kwargs)
 
+        if url.startswith("sqlite"):
+            event.listen(self._engine.sync_engine, "connect", _set_sqlite_pragmas)
+
         self._session_factory = async_sessionmaker(
             bind=self._engine,
             class_=AsyncSession,
@@ -113,6 +198,25 @@ class DatabaseManager:
         except Exception:
             return False
 
+    async def warmup(self) -> int:
+        """
+        预先建立连接池中的连接
+
+        异步连接池没有 min_size，首批请求需要现场建立连接；
+        启动时同时签出 pool_size 个连接再全部归还，返回预热的连接数
+        """
+        pool = self.engine.pool
+        # 内存 SQLite 等使用的非队列池不保留空闲连接，无需预热
+        if not isinstance(pool, QueuePool):
+            return 0
+
+        size = pool.size()
+        async with AsyncExitStack() as stack:
+            await asyncio.gather(
+                *(stack.enter_async_context(self.engine.connect()) for _ in range(size))
+            )
+        return size
+
     async def close(self) -> None:
         """关闭连接"""
         if self._engine:
@@ -120,16 +224,28 @@ class DatabaseManager:
             self._engine = None
             self._session_factory = None
 
-    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
-        """获取会话"""
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+        会话上下文管理器
+
+        退出时立即提交/回滚并归还连接；只有发生过写入时才提交，只读请求不发送 COMMIT
+        """
         async with self.session_factory() as session:
             try:
                 yield session
-                await session.commit()
+                await session.flush()
+                if session.info.get(_HAS_WRITES):
+                    await session.commit()
             except Exception:
                 await session.rollback()
                 raise
 
+    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """获取会话（供依赖注入使用）"""
+        async with self.session() as session:
+            yield session
+
 
 # 全局实例
 db_manager = DatabaseManager()
@@ -153,6 +269,9 @@ async def init_db() -> None:
 
     await _create_first_superuser()
 
+    warmed = await db_manager.warmup()
+    logger.info("Database pool warmed up: %d connection(s)", warmed)
+
 
 async def _create_first_superuser() -> None:
     """创建初始超级管理员"""
@@ -160,23 +279,26 @@ async def _create_first_superuser() -> None:
 
     from sqlalchemy import select
 
-    from app.core.security import get_password_hash
+    from app.core.security import get_password_hash, run_in_hash_threadpool
     from app.models.user import User
 
     logger = logging.getLogger(__name__)
 
-    async for session in db_manager.get_session():
+    async with db_manager.session() as session:
+        # 仅判断是否存在，不加载 ORM 对象；存在多个超级管理员时也不会报错
         result = await session.execute(
-            select(User).where(User.is_superuser == True)  # noqa: E712
+            select(1).where(User.is_superuser.is_(True)).limit(1)
         )
-        if result.scalar_one_or_none():
+        if result.first():
             logger.info("Superuser already exists")
             return
 
         superuser = User(
             email=settings.FIRST_SUPERUSER_EMAIL,
             username=settings.FIRST_SUPERUSER_USERNAME,
-            hashed_password=get_password_hash(settings.superuser_password_value),
+            hashed_password=await run_in_hash_threadpool(
+                get_password_hash, settings.superuser_password_value
+            ),
             full_name="Administrator",
             is_active=True,
             is_superuser=True,
@@ -1,4 +1,4 @@
-from typing import Annotated
+from typing import Annotated, NamedTuple
 from fastapi import Depends, Query
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.config import settings
 from app.models.user import User
+from app.schemas.user import TokenPayload
 from app.services.user import UserService
 from app.core.security import verify_token
 from app.core.exceptions import UnauthorizedException, ForbiddenException
@@ -15,20 +16,38 @@ oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_PREFIX}/auth/login"
 )
 
-# 数据库会话依赖
+# 数据库会话依赖：每个请求一个会话，仅在发生写入时提交
 DBSession = Annotated[AsyncSession, Depends(get_db)]
 
 
-async def get_current_user(
-        db: DBSession,
+async def get_user_service(db: DBSession) -> UserService:
+    """用户服务依赖"""
+    return UserService(db)
+
+
+# 用户服务，同一请求内共享实例
+UserSvc = Annotated[UserService, Depends(get_user_service)]
+
+
+async def get_token_payload(
         token: str = Depends(oauth2_scheme)
-) -> User:
-    """获取当前用户"""
+) -> TokenPayload:
+    """
+    解析访问令牌
+
+    同一请求内的多个依赖共享此结果，Token 只验证一次
+    """
     token_data = verify_token(token)
     if not token_data or token_data.type != "access":
         raise UnauthorizedException()
+    return token_data
 
-    user_service = UserService(db)
+
+async def get_current_user(
+        user_service: UserSvc,
+        token_data: TokenPayload = Depends(get_token_payload)
+) -> User:
+    """获取当前用户"""
     user = await user_service.get_by_id(token_data.sub)
 
     if not user:
@@ -54,22 +73,28 @@ CurrentSuperUser = Annotated[User, Depends(get_current_active_superuser)]
 
 
 # 分页参数依赖
-class PaginationParams:
+class PaginationParams(NamedTuple):
     """分页参数"""
+    page: int
+    page_size: int
+    skip: int
+
+
+async def pagination_params(
+        page: int = Query(1, ge=1, description="页码"),
+        page_size: int = Query(
+            settings.DEFAULT_PAGE_SIZE,
+            ge=1,
+            le=settings.MAX_PAGE_SIZE,
+            description="每页数量"
+        )
+) -> PaginationParams:
+    """
+    解析分页参数
+
+    使用异步函数而非类依赖，避免每次请求进入线程池并构造实例
+    """
+    return PaginationParams(page, page_size, (page - 1) * page_size)
+
 
-    def __init__(
-            self,
-            page: int = Query(1, ge=1, description="页码"),
-            page_size: int = Query(
-                settings.DEFAULT_PAGE_SIZE,
-                ge=1,
-                le=settings.MAX_PAGE_SIZE,
-                description="每页数量"
-            )
-    ):
-        self.page = page
-        self.page_size = page_size
-        self.skip = (page - 1) * page_size
-
-
-Pagination = Annotated[PaginationParams, Depends()]
\ No newline at end of file
+Pagination = Annotated[PaginationParams, Depends(pagination_params)]
\ No newline at end of file
@@ -7,16 +7,18 @@ FastAPI 0.128.0 应用入口
 - 性能优化
 """
 
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Mapping
 from contextlib import asynccontextmanager
 import logging
 from typing import Any
 
+import anyio.to_thread
+import orjson
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.api.v1.router import api_router
@@ -44,6 +46,9 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("🚀 Starting %s v%s", settings.APP_NAME, "2.0.0")
     logger.info("📍 Environment: %s", settings.APP_ENV)
 
+    # 扩大通用线程池（同步依赖等）；密码哈希使用独立的按 CPU 核数限额的线程额度
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+
     try:
         await init_db()
         logger.info("✅ Database connected")
@@ -51,6 +56,10 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         logger.exception("❌ Database connection failed: %s", e)
         raise
 
+    # 预生成 OpenAPI Schema，避免首次访问文档时现场生成
+    if app.openapi_url:
+        _openapi_bytes(app)
+
     logger.info("📖 API Docs: http://%s:%s/docs", settings.HOST, settings.PORT)
     logger.info("🎉 Application ready!")
 
@@ -102,6 +111,7 @@ def create_application() -> FastAPI:
     _register_middlewares(application)
     _register_exception_handlers(application)
     _register_routers(application)
+    _register_openapi(application)
 
     return application
 
@@ -109,13 +119,14 @@ def create_application() -> FastAPI:
 def _register_middlewares(app: FastAPI) -> None:
     """注册中间件（按顺序，外层先执行）"""
 
-    # GZip 压缩
-    app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+    # GZip 压缩（小于 1500 字节的响应压缩收益不抵 CPU 开销；level 1 速度约为 5 的 3 倍）
+    app.add_middleware(GZipMiddleware, minimum_size=1500, compresslevel=1)
 
     # CORS
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=settings.CORS_ORIGINS,
+        # Starlette 以 `in` 判断来源，传入 frozenset 使每次判断为 O(1)
+        allow_origins=frozenset(settings.CORS_ORIGINS),
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
@@ -123,6 +134,24 @@ def _register_middlewares(app: FastAPI) -> None:
     )
 
 
+def _error_response(
+        status_code: int,
+        message: Any,
+        details: list[dict[str, Any]] | None = None,
+        headers: Mapping[str, str] | None = None,
+) -> Response:
+    """构造错误响应（直接序列化为字节，跳过响应类的渲染流程）"""
+    error: dict[str, Any] = {"code": status_code, "message": message}
+    if details is not None:
+        error["details"] = details
+    return Response(
+        content=orjson.dumps({"success": False, "error": error}),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
 def _register_exception_handlers(app: FastAPI) -> None:
     """注册异常处理器"""
 
@@ -130,24 +159,15 @@ def _register_exception_handlers(app: FastAPI) -> None:
     async def app_exception_handler(
             request: Request,
             exc: AppException,
-    ) -> ORJSONResponse:
+    ) -> Response:
         """自定义应用异常"""
-        return ORJSONResponse(
-            status_code=exc.status_code,
-            content={
-                "success": False,
-                "error": {
-                    "code": exc.status_code,
-                    "message": exc.detail,
-                },
-            },
-        )
+        return _error_response(exc.status_code, exc.detail, headers=exc.headers)
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(
             request: Request,
             exc: RequestValidationError,
-    ) -> ORJSONResponse:
+    ) -> Response:
         """请求验证错误"""
         errors = [
             {
@@ -157,51 +177,30 @@ def _register_exception_handlers(app: FastAPI) -> None:
             }
             for err in exc.errors()
         ]
-        return ORJSONResponse(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            content={
-                "success": False,
-                "error": {
-                    "code": 422,
-                    "message": "Validation Error",
-                    "details": errors,
-                },
-            },
+        return _error_response(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            "Validation Error",
+            details=errors,
         )
 
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(
             request: Request,
             exc: StarletteHTTPException,
-    ) -> ORJSONResponse:
+    ) -> Response:
         """HTTP 异常"""
-        return ORJSONResponse(
-            status_code=exc.status_code,
-            content={
-                "success": False,
-                "error": {
-                    "code": exc.status_code,
-                    "message": exc.detail,
-                },
-            },
-        )
+        return _error_response(exc.status_code, exc.detail, headers=exc.headers)
 
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(
             request: Request,
             exc: Exception,
-    ) -> ORJSONResponse:
+    ) -> Response:
         """未处理异常"""
         logger.exception("Unhandled exception: %s", exc)
-        return ORJSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "success": False,
-                "error": {
-                    "code": 500,
-                    "message": str(exc) if settings.DEBUG else "Internal Server Error",
-                },
-            },
+        return _error_response(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            str(exc) if settings.DEBUG else "Internal Server Error",
         )
 
 
@@ -259,11 +258,49 @@ def _register_routers(app: FastAPI) -> None:
         return {"ping": "pong"}
 
 
+def _openapi_bytes(app: FastAPI, root_path: str = "") -> bytes:
+    """获取预序列化的 OpenAPI Schema（按 root_path 分别缓存）"""
+    cache: dict[str, bytes] = app.state.openapi_bytes
+    body = cache.get(root_path)
+    if body is None:
+        schema = app.openapi()
+        # 与 FastAPI 默认路由一致：部署在代理子路径下时把 root_path 加入 servers
+        server_urls = {server.get("url") for server in app.servers}
+        if root_path and app.root_path_in_servers and root_path not in server_urls:
+            schema = {**schema, "servers": [{"url": root_path}, *app.servers]}
+        body = cache[root_path] = orjson.dumps(schema)
+    return body
+
+
+def _register_openapi(app: FastAPI) -> None:
+    """
+    替换默认 OpenAPI 路由
+
+    Schema 只序列化一次，之后每次请求直接返回缓存的字节
+    """
+    if not app.openapi_url:
+        return
+
+    app.state.openapi_bytes = {}
+    app.router.routes = [
+        route for route in app.router.routes
+        if getattr(route, "path", None) != app.openapi_url
+    ]
+
+    async def openapi(request: Request) -> Response:
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        return Response(_openapi_bytes(app, root_path), media_type="application/json")
+
+    app.add_route(app.openapi_url, openapi, include_in_schema=False)
+
+
 # 创建应用实例
 app = create_application()
 
 # ============ 开发服务器入口 ============
 if __name__ == "__main__":
+    import sys
+
     import uvicorn
 
     uvicorn.run(
@@ -271,5 +308,8 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        # uvloop 不支持 Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="debug" if settings.DEBUG else "info",
     )
\ No newline at end of file
@@ -1,6 +1,7 @@
 from datetime import datetime
-from sqlalchemy import String, Boolean, DateTime, func, Text
-from sqlalchemy.orm import Mapped, mapped_column
+from typing import Any
+from sqlalchemy import String, Boolean, DateTime, Index, func, Text
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
 
 # 从 database 导入 Base，确保使用同一个 Base
 from app.database import Base
@@ -11,6 +12,11 @@ class User(Base):
 
     __tablename__ = "users"
 
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict[str, Any]:
+        # flush 时通过 RETURNING 取回服务端默认值/onupdate 列，避免过期后再发 SELECT
+        return {"eager_defaults": True}
+
     id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     username: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
@@ -36,4 +42,8 @@ class User(Base):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
 
     def __str__(self) -> str:
-        return self.username
\ No newline at end of file
+        return self.username
+
+
+# 用户列表按创建时间倒序分页，索引可直接按序读取前 N 行而无需全表排序
+Index("ix_users_created_at_desc", User.created_at.desc(), User.id.desc())
\ No newline at end of file
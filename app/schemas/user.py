@@ -54,7 +54,8 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     """Token 载荷"""
     sub: int  # user_id
-    exp: datetime
+    iat: int  # 签发时间 (Unix 时间戳)
+    exp: int  # 过期时间 (Unix 时间戳)
     type: str  # access or refresh
 
 
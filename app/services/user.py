@@ -1,12 +1,92 @@
-from typing import Optional, List
-from sqlalchemy import select, func
+import asyncio
+import itertools
+from typing import Any, NoReturn, Optional, List
+from sqlalchemy import Row, delete, event, func, insert, lambda_stmt, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    InstrumentedAttribute,
+    Session,
+    make_transient_to_detached,
+    raiseload,
+)
+from sqlalchemy.orm.util import identity_key
 
+from app.config import settings
+from app.core.cache import TTLCache
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.schemas.user import UserCreate, UserResponse, UserUpdate
+from app.core.security import (
+    get_password_hash,
+    password_needs_rehash,
+    run_in_hash_threadpool,
+    verify_password,
+)
 from app.core.exceptions import NotFoundException, ConflictException
 
+# 用户查询缓存: ID -> 列快照；邮箱/用户名 -> ID 为二级索引，命中时校验快照字段，
+# 因此更新、删除时只需按 ID 失效。多进程部署时各进程独立，依赖短 TTL 收敛
+_user_cache: TTLCache[int, dict[str, Any]] = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL,
+)
+_user_id_index: TTLCache[tuple[str, str], int] = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE * 2,
+    ttl=settings.USER_CACHE_TTL,
+)
+
+
+# 缓存代数：查询与失效都从同一计数器取号，失效时把号码记录到对应用户 ID。
+# 写入缓存时若该用户在查询开始后被失效过则放弃写入，避免查询与提交交错时缓存旧数据
+_generations = itertools.count(1)
+_user_generations: TTLCache[int, int] = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL,
+)
+
+# 会话 info 中待失效的用户 ID：写入后立即失效一次，事务结束后再失效一次，
+# 避免提交前并发读取把旧数据重新写入缓存
+_PENDING_INVALIDATIONS = "user_cache_pending_invalidations"
+
+
+def clear_user_cache() -> None:
+    """清空用户缓存"""
+    _user_cache.clear()
+    _user_id_index.clear()
+
+
+def _invalidate_cached(*user_ids: int) -> None:
+    """失效用户缓存并推进其代数"""
+    generation = next(_generations)
+    for user_id in user_ids:
+        _user_generations.set(user_id, generation)
+    _user_cache.delete(*user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_after_transaction(session: Session) -> None:
+    """事务提交/回滚后再次失效本事务修改过的用户"""
+    user_ids = session.info.pop(_PENDING_INVALIDATIONS, None)
+    if user_ids:
+        _invalidate_cached(*user_ids)
+
+
+# 禁止隐式懒加载：关联数据必须显式 selectinload，避免序列化时触发 N+1 查询
+_NO_LAZY_LOAD = (raiseload("*"),)
+
+# 用户列表只查询响应 Schema 需要的列
+_LIST_COLUMNS = tuple(getattr(User, name) for name in UserResponse.model_fields)
+# 登录认证只需要的列
+_AUTH_COLUMNS = (User.id, User.hashed_password, User.is_active)
+
+# 支持 INSERT ... ON CONFLICT DO NOTHING 的方言
+_ON_CONFLICT_DIALECTS = frozenset({"postgresql", "sqlite"})
+
+# 用户不存在时用于等时验证的哈希，防止通过响应时间枚举用户名
+_DUMMY_HASH = get_password_hash("dummy-password-for-timing")
+
 
 class UserService:
     """用户服务"""
@@ -16,111 +96,261 @@ class UserService:
 
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """根据 ID 获取用户"""
-        result = await self.db.execute(
-            select(User).where(User.id == user_id)
-        )
-        return result.scalar_one_or_none()
+        user = await self._get_cached("id", user_id)
+        if user is None:
+            generation = next(_generations)
+            # Session.get 先查会话标识映射，命中时不发出 SQL
+            user = await self.db.get(User, user_id, options=_NO_LAZY_LOAD)
+            self._cache(user, generation)
+        return user
 
     async def get_by_email(self, email: str) -> Optional[User]:
         """根据邮箱获取用户"""
-        result = await self.db.execute(
-            select(User).where(User.email == email)
-        )
-        return result.scalar_one_or_none()
+        user = await self._get_cached("email", email)
+        if user is None:
+            generation = next(_generations)
+            result = await self.db.execute(
+                lambda_stmt(
+                    lambda: select(User).options(*_NO_LAZY_LOAD).where(User.email == email)
+                )
+            )
+            user = result.scalar_one_or_none()
+            self._cache(user, generation)
+        return user
 
     async def get_by_username(self, username: str) -> Optional[User]:
         """根据用户名获取用户"""
-        result = await self.db.execute(
-            select(User).where(User.username == username)
-        )
-        return result.scalar_one_or_none()
+        user = await self._get_cached("username", username)
+        if user is None:
+            generation = next(_generations)
+            result = await self.db.execute(
+                lambda_stmt(
+                    lambda: select(User).options(*_NO_LAZY_LOAD).where(User.username == username)
+                )
+            )
+            user = result.scalar_one_or_none()
+            self._cache(user, generation)
+        return user
 
     async def get_by_username_or_email(self, identifier: str) -> Optional[User]:
-        """根据用户名或邮箱获取用户"""
-        result = await self.db.execute(
-            select(User).where(
-                (User.username == identifier) | (User.email == identifier)
-            )
-        )
-        return result.scalar_one_or_none()
+        """
+        根据用户名或邮箱获取用户
+
+        按是否含 "@" 分派到单列唯一索引查询，避免 OR 条件导致无法走索引；
+        用户名本身允许包含 "@"，邮箱未命中时再按用户名查询
+        """
+        if "@" in identifier:
+            user = await self.get_by_email(identifier)
+            if user is not None:
+                return user
+        return await self.get_by_username(identifier)
 
     async def get_list(
             self,
             skip: int = 0,
             limit: int = 20
-    ) -> tuple[List[User], int]:
-        """获取用户列表"""
-        # 获取总数
-        count_result = await self.db.execute(
-            select(func.count()).select_from(User)
-        )
-        total = count_result.scalar()
+    ) -> tuple[List[Row[Any]], int]:
+        """
+        获取用户列表
 
-        # 获取列表
+        只查询响应所需的列，返回行而非 ORM 实例
+        """
+        # 窗口函数随分页结果一并返回总数，一次往返完成
         result = await self.db.execute(
-            select(User)
-            .offset(skip)
-            .limit(limit)
-            .order_by(User.created_at.desc())
+            lambda_stmt(
+                lambda: select(*_LIST_COLUMNS, func.count().over().label("total"))
+                .order_by(User.created_at.desc(), User.id.desc())
+                .offset(skip)
+                .limit(limit)
+            )
         )
-        users = result.scalars().all()
+        rows = result.all()
+        if rows:
+            return list(rows), rows[0].total
 
-        return list(users), total
+        # 页码超出范围时没有返回行，单独查询总数
+        total = (await self.db.scalar(select(func.count()).select_from(User)) or 0) if skip else 0
+        return [], total
 
     async def create(self, user_in: UserCreate) -> User:
         """创建用户"""
-        # 检查邮箱是否存在
-        if await self.get_by_email(user_in.email):
-            raise ConflictException("Email already registered")
-
-        # 检查用户名是否存在
-        if await self.get_by_username(user_in.username):
-            raise ConflictException("Username already taken")
-
-        user = User(
+        # 线程池中计算哈希的同时签出连接（含 pre-ping 与 BEGIN），重叠 CPU 与 I/O 等待
+        hashed_password, _ = await asyncio.gather(
+            run_in_hash_threadpool(get_password_hash, user_in.password),
+            self.db.connection(),
+        )
+        # INSERT ... ON CONFLICT DO NOTHING RETURNING：无冲突时一次往返完成，
+        # 且不存在"先查后插"的竞态；仅在冲突时再查询具体冲突字段
+        user = await self._insert_ignore_conflicts(
             email=user_in.email,
             username=user_in.username,
             full_name=user_in.full_name,
-            hashed_password=get_password_hash(user_in.password),
+            hashed_password=hashed_password,
         )
-        self.db.add(user)
-        await self.db.flush()
-        await self.db.refresh(user)
+        if user is None:
+            await self._raise_conflict(user_in)
+        # SQLite 删除后会复用最大 rowid，新用户可能沿用旧用户的 ID
+        self._invalidate(user.id)
         return user
 
-    async def update(self, user_id: int, user_in: UserUpdate) -> User:
-        """更新用户"""
-        user = await self.get_by_id(user_id)
-        if not user:
-            raise NotFoundException("User not found")
+    async def _insert_ignore_conflicts(self, **values: Any) -> Optional[User]:
+        """插入用户，唯一约束冲突时返回 None"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect in _ON_CONFLICT_DIALECTS:
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(User).on_conflict_do_nothing().values(**values).returning(User)
+            return (await self.db.scalars(stmt)).one_or_none()
 
-        update_data = user_in.model_dump(exclude_unset=True)
+        # 其他方言不支持 ON CONFLICT：在 SAVEPOINT 中插入，冲突时只回滚该 SAVEPOINT
+        try:
+            async with self.db.begin_nested():
+                result = await self.db.scalars(insert(User).values(**values).returning(User))
+                return result.one()
+        except IntegrityError:
+            # 只有确实存在重复的邮箱/用户名时才视为冲突，NOT NULL、外键等错误原样抛出
+            if await self._find_conflict(values["email"], values["username"]) is None:
+                raise
+            return None
 
-        # 如果更新密码，需要哈希
-        if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+    async def _find_conflict(self, email: str, username: str) -> Optional[Row[Any]]:
+        """查询邮箱或用户名重复的已有用户"""
+        result = await self.db.execute(
+            select(User.email, User.username)
+            .where((User.email == email) | (User.username == username))
+            .limit(1)
+        )
+        return result.first()
 
-        for field, value in update_data.items():
-            setattr(user, field, value)
+    async def _raise_conflict(self, user_in: UserCreate) -> NoReturn:
+        """查询冲突字段并抛出异常"""
+        existing = await self._find_conflict(user_in.email, user_in.username)
+        if existing is None:
+            # 冲突行已被并发删除，或冲突来自其他唯一约束
+            raise ConflictException()
+        if existing.email == user_in.email:
+            raise ConflictException("Email already registered")
+        raise ConflictException("Username already taken")
+
+    async def update(self, user_id: int, user_in: UserUpdate) -> User:
+        """更新用户"""
+        # 直接遍历已设置的字段，省去 model_dump 的序列化与中间字典
+        update_data: dict[str, Any] = {}
+        for field in user_in.model_fields_set:
+            value = getattr(user_in, field)
+            # 如果更新密码，需要哈希
+            if field == "password":
+                update_data["hashed_password"] = await run_in_hash_threadpool(
+                    get_password_hash, value
+                )
+            else:
+                update_data[field] = value
 
-        await self.db.flush()
-        await self.db.refresh(user)
+        if not update_data:
+            user = await self.get_by_id(user_id)
+            if not user:
+                raise NotFoundException("User not found")
+            return user
+
+        # UPDATE ... RETURNING 一次往返完成，无需先 SELECT 加载
+        result = await self.db.scalars(
+            update(User)
+            .where(User.id == user_id)
+            .values(**update_data)
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        user = result.one_or_none()
+        if user is None:
+            raise NotFoundException("User not found")
+        self._invalidate(user_id)
         return user
 
     async def delete(self, user_id: int) -> bool:
         """删除用户"""
-        user = await self.get_by_id(user_id)
-        if not user:
+        # 单条 DELETE ... RETURNING，无需先加载实例；User 无需 Python 侧级联处理
+        result = await self.db.execute(
+            delete(User).where(User.id == user_id).returning(User.id)
+        )
+        if result.first() is None:
             raise NotFoundException("User not found")
-
-        await self.db.delete(user)
+        self._invalidate(user_id)
         return True
 
-    async def authenticate(self, username: str, password: str) -> Optional[User]:
-        """验证用户"""
-        user = await self.get_by_username_or_email(username)
+    async def authenticate(self, username: str, password: str) -> Optional[Row[Any]]:
+        """
+        验证用户
+
+        只查询认证所需的列，返回 (id, hashed_password, is_active) 行而非 ORM 实例，
+        不会把部分加载的实例放入会话标识映射
+        """
+        user = None
+        if "@" in username:
+            user = await self._get_for_auth(User.email, username)
+        if user is None:
+            user = await self._get_for_auth(User.username, username)
         if not user:
+            # 用户不存在时同样执行一次哈希验证，使两条分支耗时一致
+            await run_in_hash_threadpool(verify_password, password, _DUMMY_HASH)
+            return None
+        # 密码哈希为 CPU 密集操作，放入线程池避免阻塞事件循环
+        if not await run_in_hash_threadpool(verify_password, password, user.hashed_password):
+            return None
+        # 旧哈希（bcrypt 或 Argon2 参数变更）在登录成功时升级
+        if password_needs_rehash(user.hashed_password):
+            self._invalidate(user.id)
+            await self.db.execute(
+                update(User)
+                .where(User.id == user.id)
+                .values(hashed_password=await run_in_hash_threadpool(get_password_hash, password))
+            )
+        return user
+
+    async def _get_for_auth(
+            self,
+            column: InstrumentedAttribute[str],
+            value: str
+    ) -> Optional[Row[Any]]:
+        """按单列唯一索引查询认证所需的列"""
+        result = await self.db.execute(
+            lambda_stmt(lambda: select(*_AUTH_COLUMNS).where(column == value))
+        )
+        return result.one_or_none()
+
+    async def _get_cached(self, field: str, value: int | str) -> Optional[User]:
+        """从进程级缓存读取用户，并挂载到当前会话（不发出 SQL）"""
+        user_id = value if isinstance(value, int) else _user_id_index.get((field, value))
+        if user_id is None:
             return None
-        if not verify_password(password, user.hashed_password):
+        # 已在当前会话中的实例优先，避免缓存快照覆盖会话内的状态
+        user = self.db.identity_map.get(identity_key(User, user_id))
+        if user is not None and user.__dict__.get(field) == value:
+            return user
+        data = _user_cache.get(user_id)
+        # 邮箱/用户名已变更时二级索引过期，视为未命中
+        if data is None or data[field] != value:
             return None
-        return user
\ No newline at end of file
+        user = User(**data)
+        make_transient_to_detached(user)
+        return await self.db.merge(user, load=False)
+
+    def _cache(self, user: Optional[User], generation: int) -> None:
+        """
+        缓存用户列快照（不缓存 ORM 实例本身，避免跨会话共享）
+
+        generation 为查询开始前的缓存代数，查询期间该用户被失效过时不写入
+        """
+        if user is None:
+            return
+        # 本事务修改过的用户尚未提交，不写入缓存
+        if user.id in self.db.info.get(_PENDING_INVALIDATIONS, ()):
+            return
+        if (_user_generations.get(user.id) or 0) > generation:
+            return
+        _user_cache.set(user.id, user.to_dict())
+        _user_id_index.set(("email", user.email), user.id)
+        _user_id_index.set(("username", user.username), user.id)
+
+    def _invalidate(self, user_id: int) -> None:
+        """失效用户缓存，并在当前事务结束后再次失效"""
+        _invalidate_cached(user_id)
+        self.db.info.setdefault(_PENDING_INVALIDATIONS, set()).add(user_id)
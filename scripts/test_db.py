@@ -28,7 +28,7 @@ async def test_database():
 
         # 2. 测试查询
         print("\n2️⃣  Testing database query...")
-        async for session in db_manager.get_session():
+        async with db_manager.session() as session:
             result = await session.execute(select(User))
             users = result.scalars().all()
             print(f"   ✅ Found {len(users)} user(s) in database")
@@ -41,7 +41,7 @@ async def test_database():
         from app.services.user import UserService
         from app.schemas.user import UserCreate
 
-        async for session in db_manager.get_session():
+        async with db_manager.session() as session:
             user_service = UserService(session)
 
             # 检查测试用户是否存在
@@ -1,58 +1,123 @@
-import asyncio
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import db_manager, get_db
 from app.config import settings
+from app.core import cache as cache_module
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.services.user import clear_user_cache
+from tests.utils import FakeClock
 
 # 测试数据库 URL
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./data/test.db"
 
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator:
-    """创建事件循环"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """所有异步测试共用会话级事件循环，与会话级引擎、客户端保持一致"""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop, append=False)
 
 
-@pytest_asyncio.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
-    """创建测试数据库会话"""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    """替换缓存模块使用的时钟"""
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
 
-    async_session = async_sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
+@pytest_asyncio.fixture(scope="session")
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    """创建测试引擎（整个测试会话只建一次表）"""
+    db_manager.init(TEST_DATABASE_URL)
+    sync_engine = db_manager.engine.sync_engine
+
+    # pysqlite 默认自行管理事务，SAVEPOINT 无法正常工作；改为由 SQLAlchemy 显式 BEGIN
+    @event.listens_for(sync_engine, "connect")
+    def _disable_pysqlite_transaction(dbapi_connection, connection_record):  # noqa: ARG001
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    await db_manager.drop_tables()
+    await db_manager.create_tables()
+    await db_manager.warmup()
 
-    async with async_session() as session:
-        yield session
+    yield db_manager.engine
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+    await db_manager.drop_tables()
+    await db_manager.close()
 
-    await engine.dispose()
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """创建测试数据库会话，测试结束后回滚外层事务"""
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        # 会话内的 commit 只释放 SAVEPOINT，不会提交外层事务
+        async with AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        ) as session:
+            yield session
+        await trans.rollback()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """会话级 HTTP 客户端，复用 ASGI 传输"""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
 
 
 @pytest_asyncio.fixture(scope="function")
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """创建测试客户端"""
+async def client(
+        http_client: AsyncClient, db_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """创建测试客户端，请求使用当前测试的数据库会话"""
 
     async def override_get_db():
         yield db_session
 
+    # 每个测试回滚数据库，清空进程级用户缓存
+    clear_user_cache()
     app.dependency_overrides[get_db] = override_get_db
 
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
-        yield ac
+    yield http_client
+
+    app.dependency_overrides.clear()
+
 
-    app.dependency_overrides.clear()
\ No newline at end of file
+@pytest_asyncio.fixture(scope="function")
+async def superuser_headers(
+        client: AsyncClient, db_session: AsyncSession
+) -> dict[str, str]:
+    """创建超级管理员并返回认证请求头"""
+    db_session.add(
+        User(
+            email="admin@example.com",
+            username="admin",
+            hashed_password=get_password_hash("adminpassword123"),
+            is_superuser=True,
+        )
+    )
+    await db_session.flush()
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "admin", "password": "adminpassword123"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,57 @@
+from app.core.cache import TTLCache
+from tests.utils import FakeClock
+
+
+def test_get_and_expiry(clock: FakeClock):
+    """测试写入后可读取，过期后返回 None 并移除"""
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+
+    clock.advance(4.9)
+    assert cache.get("a") == 1
+
+    clock.advance(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl(clock: FakeClock):
+    """测试单条目 ttl 覆盖默认过期时间"""
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", 1, ttl=1)
+    cache.set("default", 2)
+
+    clock.advance(2)
+    assert cache.get("short") is None
+    assert cache.get("default") == 2
+
+
+def test_lru_eviction(clock: FakeClock):  # noqa: ARG001
+    """测试超过 maxsize 时淘汰最久未使用的条目"""
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # 读取 a 使其成为最近使用
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_delete_and_clear(clock: FakeClock):  # noqa: ARG001
+    """测试删除与清空"""
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    cache.delete("a", "b", "missing")
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    cache.clear()
+    assert len(cache) == 0
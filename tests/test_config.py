@@ -27,6 +27,8 @@ def test_config_default_values():
     assert actual_db_path == expected_db_path
     assert settings.FIRST_SUPERUSER_EMAIL == "admin@example.com"
     assert settings.FIRST_SUPERUSER_USERNAME == "admin"
+    assert settings.ARGON2_TIME_COST == 3
+    assert settings.ARGON2_MEMORY_COST == 65536
 
 
 def test_config_properties_with_defaults():
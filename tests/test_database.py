@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+
+from app.database import DatabaseManager
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url",
+    [
+        "sqlite+aiosqlite://",
+        "sqlite+aiosqlite:///:memory:",
+        "sqlite+aiosqlite:///file:memdb?mode=memory&cache=shared&uri=true",
+    ],
+)
+async def test_memory_sqlite_shares_one_database(url: str):
+    """测试内存 SQLite 不使用队列池，建表后所有连接可见"""
+    manager = DatabaseManager()
+    manager.init(url)
+    try:
+        assert not isinstance(manager.engine.pool, QueuePool)
+        await manager.create_tables()
+        assert await manager.warmup() == 0
+
+        for _ in range(3):
+            async with manager.engine.connect() as conn:
+                await conn.execute(text("SELECT count(*) FROM users"))
+    finally:
+        await manager.close()
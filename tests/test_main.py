@@ -0,0 +1,23 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_openapi_servers_follow_root_path():
+    """测试部署在代理子路径下时 OpenAPI Schema 包含 root_path 对应的 server"""
+    openapi_url = f"{settings.API_V1_PREFIX}/openapi.json"
+
+    transport = ASGITransport(app=app, root_path="/proxy")
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.get(f"/proxy{openapi_url}")
+    assert response.status_code == 200
+    assert response.json()["servers"] == [{"url": "/proxy"}]
+
+    # 不同 root_path 分别缓存，互不影响
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get(openapi_url)
+    assert response.status_code == 200
+    assert "servers" not in response.json()
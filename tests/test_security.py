@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import anyio
+import bcrypt
+import pytest
+
+from app.config import settings
+from app.core import security
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    create_token,
+    get_password_hash,
+    password_needs_rehash,
+    run_in_hash_threadpool,
+    verify_password,
+    verify_token,
+)
+from tests.utils import FakeClock
+
+
+def test_access_token_roundtrip():
+    """测试访问令牌签发与验证"""
+    token = create_access_token(42)
+    payload = verify_token(token)
+
+    assert payload is not None
+    assert payload.sub == 42
+    assert payload.type == "access"
+    assert payload.exp - payload.iat == settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+def test_refresh_token_type():
+    """测试刷新令牌类型"""
+    payload = verify_token(create_refresh_token(7))
+
+    assert payload is not None
+    assert payload.type == "refresh"
+
+
+def test_invalid_token():
+    """测试无效令牌"""
+    assert verify_token("not-a-jwt") is None
+
+
+def test_token_cache_ttl_capped_by_expiry(clock: FakeClock):
+    """测试 Token 缓存时间不超过其剩余有效期"""
+    token = create_token(1, "access", timedelta(seconds=5))
+
+    assert verify_token(token) is not None
+    assert security._token_cache.get(token) is not None
+
+    # 超过 Token 剩余有效期（小于 TOKEN_CACHE_TTL）后缓存失效
+    clock.advance(6)
+    assert settings.TOKEN_CACHE_TTL > 6
+    assert security._token_cache.get(token) is None
+
+
+def test_password_hash_argon2():
+    """测试 Argon2id 密码哈希"""
+    hashed = get_password_hash("secret-password")
+
+    assert hashed.startswith("$argon2id$")
+    assert verify_password("secret-password", hashed)
+    assert not verify_password("wrong-password", hashed)
+    assert not password_needs_rehash(hashed)
+
+
+def test_password_legacy_bcrypt():
+    """测试兼容旧的 bcrypt 哈希"""
+    hashed = bcrypt.hashpw(b"secret-password", bcrypt.gensalt(rounds=4)).decode()
+
+    assert verify_password("secret-password", hashed)
+    assert not verify_password("wrong-password", hashed)
+    assert password_needs_rehash(hashed)
+
+
+@pytest.mark.asyncio
+async def test_hash_threadpool_limit(monkeypatch: pytest.MonkeyPatch):
+    """测试密码哈希受独立线程限额约束"""
+    monkeypatch.setattr(security, "_hash_limiter", anyio.CapacityLimiter(2))
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    await asyncio.gather(*(run_in_hash_threadpool(work) for _ in range(6)))
+    assert peak == 2
@@ -0,0 +1,183 @@
+from collections.abc import AsyncGenerator, Generator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.exceptions import ConflictException
+from app.core.security import get_password_hash
+from app.database import db_manager
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+from app.services import user as user_service
+from app.services.user import UserService, clear_user_cache
+
+
+@pytest_asyncio.fixture(scope="function")
+async def committed_user(engine: AsyncEngine) -> AsyncGenerator[User, None]:  # noqa: ARG001
+    """通过真实会话提交的用户，测试结束后删除"""
+    clear_user_cache()
+    async with db_manager.session() as session:
+        user = User(
+            email="cached@example.com",
+            username="cacheduser",
+            hashed_password=get_password_hash("testpassword123"),
+            full_name="old",
+        )
+        session.add(user)
+
+    yield user
+
+    async with db_manager.session() as session:
+        await session.execute(delete(User).where(User.id == user.id))
+    clear_user_cache()
+
+
+@pytest.fixture(scope="function")
+def statements(engine: AsyncEngine) -> Generator[list[str], None, None]:
+    """记录测试期间发出的 SQL"""
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_query(committed_user: User, statements: list[str]):
+    """测试缓存命中时不发出 SQL，并挂载到新会话"""
+    async with db_manager.session() as session:
+        await UserService(session).get_by_email(committed_user.email)
+
+    statements.clear()
+    async with db_manager.session() as session:
+        service = UserService(session)
+        user = await service.get_by_username(committed_user.username)
+
+        assert user is not None
+        assert user.id == committed_user.id
+        assert user.full_name == "old"
+        assert user in session
+        assert await service.get_by_id(committed_user.id) is user
+        assert await service.get_by_email(committed_user.email) is user
+    assert statements == []
+
+
+@pytest.mark.asyncio
+async def test_cache_prefers_session_instance(committed_user: User):
+    """测试会话中已有实例时直接返回，不被缓存快照覆盖"""
+    async with db_manager.session() as session:
+        await UserService(session).get_by_id(committed_user.id)
+
+    async with db_manager.session() as session:
+        service = UserService(session)
+        user = await service.get_by_id(committed_user.id)
+        assert user is not None
+        user.full_name = "pending"
+
+        assert await service.get_by_email(committed_user.email) is user
+        assert user.full_name == "pending"
+        await session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_authenticate_leaves_no_partial_instance(committed_user: User):
+    """测试认证后同一会话内仍能获取完整的用户实例"""
+    async with db_manager.session() as session:
+        service = UserService(session)
+        authenticated = await service.authenticate(committed_user.username, "testpassword123")
+        assert authenticated is not None
+        assert authenticated.id == committed_user.id
+
+        user = await service.get_by_id(committed_user.id)
+        assert user is not None
+        assert user.email == committed_user.email
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_after_commit(committed_user: User):
+    """测试提交前被并发读取重新缓存的旧数据在提交后失效"""
+    async with db_manager.session() as writer:
+        await UserService(writer).update(
+            committed_user.id, UserUpdate(full_name="new", username="renameduser")
+        )
+        # 写事务提交前，并发读取到旧数据并写入缓存
+        async with db_manager.session() as reader:
+            user = await UserService(reader).get_by_id(committed_user.id)
+            assert user is not None
+            assert user.full_name == "old"
+
+    async with db_manager.session() as session:
+        service = UserService(session)
+        user = await service.get_by_id(committed_user.id)
+        assert user is not None
+        assert user.full_name == "new"
+        # 用户名变更后旧的二级索引不再命中
+        assert await service.get_by_username("cacheduser") is None
+
+
+@pytest.mark.asyncio
+async def test_deleted_user_not_served_from_cache(committed_user: User):
+    """测试删除提交后不再从缓存返回用户"""
+    async with db_manager.session() as writer:
+        await UserService(writer).delete(committed_user.id)
+        async with db_manager.session() as reader:
+            assert await UserService(reader).get_by_id(committed_user.id) is not None
+
+    async with db_manager.session() as session:
+        assert await UserService(session).get_by_id(committed_user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_stale_read_not_cached_after_commit(
+        committed_user: User, monkeypatch: pytest.MonkeyPatch
+):
+    """测试查询读到旧数据后写事务才提交时，旧数据不会写入缓存"""
+    async with db_manager.session() as reader:
+        original_get = reader.get
+
+        async def get_then_commit(*args, **kwargs):
+            user = await original_get(*args, **kwargs)
+            # 读取完成、写入缓存之前，另一个事务更新并提交
+            async with db_manager.session() as writer:
+                await UserService(writer).update(committed_user.id, UserUpdate(full_name="new"))
+            return user
+
+        monkeypatch.setattr(reader, "get", get_then_commit)
+        user = await UserService(reader).get_by_id(committed_user.id)
+        assert user is not None
+        assert user.full_name == "old"
+
+    async with db_manager.session() as session:
+        user = await UserService(session).get_by_id(committed_user.id)
+        assert user is not None
+        assert user.full_name == "new"
+
+
+@pytest.mark.asyncio
+async def test_insert_fallback_reraises_non_unique_errors(
+        db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    """测试不支持 ON CONFLICT 的方言下，非唯一约束错误不被当作冲突"""
+    monkeypatch.setattr(user_service, "_ON_CONFLICT_DIALECTS", frozenset())
+    service = UserService(db_session)
+
+    with pytest.raises(IntegrityError):
+        await service._insert_ignore_conflicts(
+            email="null@example.com", username="nulluser", hashed_password=None
+        )
+
+
+@pytest.mark.asyncio
+async def test_conflict_without_existing_row(db_session: AsyncSession):
+    """测试找不到冲突行时返回通用冲突信息"""
+    user_in = UserCreate(email="gone@example.com", username="goneuser", password="testpassword123")
+
+    with pytest.raises(ConflictException) as exc_info:
+        await UserService(db_session)._raise_conflict(user_in)
+    assert exc_info.value.detail == "Resource already exists"
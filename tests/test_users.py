@@ -1,5 +1,14 @@
+import bcrypt
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.database import db_manager
+from app.main import app
+from app.models.user import User
+from app.services import user as user_service
+from app.services.user import clear_user_cache
 
 
 @pytest.mark.asyncio
@@ -20,6 +29,62 @@ async def test_register_user(client: AsyncClient):
     assert data["username"] == "testuser"
 
 
+@pytest.mark.asyncio
+async def test_register_conflict(client: AsyncClient):
+    """测试重复注册"""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "dup@example.com",
+            "username": "dupuser",
+            "password": "testpassword123"
+        }
+    )
+
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "dup@example.com",
+            "username": "otheruser",
+            "password": "testpassword123"
+        }
+    )
+    assert response.status_code == 409
+    assert response.json()["error"]["message"] == "Email already registered"
+
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "other@example.com",
+            "username": "dupuser",
+            "password": "testpassword123"
+        }
+    )
+    assert response.status_code == 409
+    assert response.json()["error"]["message"] == "Username already taken"
+
+
+@pytest.mark.asyncio
+async def test_register_conflict_without_on_conflict(
+        client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    """测试不支持 ON CONFLICT 的方言下重复注册仍返回 409"""
+    monkeypatch.setattr(user_service, "_ON_CONFLICT_DIALECTS", frozenset())
+    payload = {"email": "dup@example.com", "username": "dupuser", "password": "testpassword123"}
+    await client.post("/api/v1/auth/register", json=payload)
+
+    response = await client.post("/api/v1/auth/register", json=payload)
+    assert response.status_code == 409
+    assert response.json()["error"]["message"] == "Email already registered"
+
+    # 冲突只回滚 SAVEPOINT，同一会话仍可继续注册
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": "new@example.com", "username": "newuser", "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_login(client: AsyncClient):
     """测试用户登录"""
@@ -47,6 +112,23 @@ async def test_login(client: AsyncClient):
     assert "refresh_token" in data
 
 
+@pytest.mark.asyncio
+async def test_login_with_email(client: AsyncClient):
+    """测试使用邮箱登录（用户名中含 @ 时回退到用户名）"""
+    for email, username in (("mail@example.com", "mailuser"), ("other@example.com", "we@ird")):
+        await client.post(
+            "/api/v1/auth/register",
+            json={"email": email, "username": username, "password": "testpassword123"}
+        )
+
+    for identifier in ("mail@example.com", "we@ird"):
+        response = await client.post(
+            "/api/v1/auth/login",
+            data={"username": identifier, "password": "testpassword123"}
+        )
+        assert response.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_get_me(client: AsyncClient):
     """测试获取当前用户"""
@@ -73,4 +155,174 @@ async def test_get_me(client: AsyncClient):
     )
     assert response.status_code == 200
     data = response.json()
-    assert data["username"] == "meuser"
\ No newline at end of file
+    assert data["username"] == "meuser"
+
+
+@pytest.mark.asyncio
+async def test_get_users(client: AsyncClient, superuser_headers: dict[str, str]):
+    """测试获取用户列表"""
+    for i in range(3):
+        await client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": f"list{i}@example.com",
+                "username": f"listuser{i}",
+                "password": "testpassword123"
+            }
+        )
+
+    response = await client.get(
+        "/api/v1/users",
+        params={"page": 1, "page_size": 3},
+        headers=superuser_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 4
+    assert data["total_pages"] == 2
+    assert len(data["items"]) == 3
+
+    # 超出范围的页码仍返回总数
+    response = await client.get(
+        "/api/v1/users",
+        params={"page": 5, "page_size": 3},
+        headers=superuser_headers
+    )
+    data = response.json()
+    assert data["items"] == []
+    assert data["total"] == 4
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_legacy_hash(client: AsyncClient, db_session: AsyncSession):
+    """测试登录时升级旧的 bcrypt 哈希"""
+    user = User(
+        email="legacy@example.com",
+        username="legacyuser",
+        hashed_password=bcrypt.hashpw(b"testpassword123", bcrypt.gensalt(rounds=4)).decode(),
+    )
+    db_session.add(user)
+    await db_session.flush()
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "legacyuser", "password": "testpassword123"}
+    )
+    assert response.status_code == 200
+
+    await db_session.refresh(user)
+    assert user.hashed_password.startswith("$argon2id$")
+
+
+@pytest.mark.asyncio
+async def test_update_me(client: AsyncClient):
+    """测试更新当前用户"""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "update@example.com",
+            "username": "updateuser",
+            "password": "testpassword123"
+        }
+    )
+    login_response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "updateuser", "password": "testpassword123"}
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    response = await client.put(
+        "/api/v1/users/me",
+        json={"full_name": "Updated Name", "password": "newpassword123"},
+        headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Updated Name"
+
+    response = await client.get("/api/v1/auth/me", headers=headers)
+    assert response.json()["full_name"] == "Updated Name"
+
+    # 旧密码失效，新密码可登录
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "updateuser", "password": "testpassword123"}
+    )
+    assert response.status_code == 401
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": "updateuser", "password": "newpassword123"}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_delete_user(client: AsyncClient, superuser_headers: dict[str, str]):
+    """测试管理员删除用户"""
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "delete@example.com",
+            "username": "deleteuser",
+            "password": "testpassword123"
+        }
+    )
+    user_id = response.json()["id"]
+
+    response = await client.delete(f"/api/v1/users/{user_id}", headers=superuser_headers)
+    assert response.status_code == 200
+
+    response = await client.delete(f"/api/v1/users/{user_id}", headers=superuser_headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_write_route_uses_one_connection(http_client: AsyncClient, engine: AsyncEngine):
+    """测试写接口使用真实会话时每个请求只签出一个连接"""
+    app.dependency_overrides.clear()
+    clear_user_cache()
+    checked_out = peak = 0
+
+    def on_checkout(*args) -> None:  # noqa: ARG001
+        nonlocal checked_out, peak
+        checked_out += 1
+        peak = max(peak, checked_out)
+
+    def on_checkin(*args) -> None:  # noqa: ARG001
+        nonlocal checked_out
+        checked_out -= 1
+
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    event.listen(engine.sync_engine, "checkin", on_checkin)
+    try:
+        await http_client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "live@example.com",
+                "username": "liveuser",
+                "password": "testpassword123"
+            }
+        )
+        response = await http_client.post(
+            "/api/v1/auth/login",
+            data={"username": "liveuser", "password": "testpassword123"}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        # 冷缓存下当前用户需从数据库加载，与更新共用同一会话
+        clear_user_cache()
+        response = await http_client.put(
+            "/api/v1/users/me", headers=headers, json={"full_name": "Live User"}
+        )
+        assert response.status_code == 200
+        assert peak == 1
+
+        # 更新已提交，新请求可读取
+        clear_user_cache()
+        response = await http_client.get("/api/v1/auth/me", headers=headers)
+        assert response.json()["full_name"] == "Live User"
+    finally:
+        event.remove(engine.sync_engine, "checkout", on_checkout)
+        event.remove(engine.sync_engine, "checkin", on_checkin)
+        async with db_manager.session() as session:
+            await session.execute(delete(User).where(User.username == "liveuser"))
+        clear_user_cache()
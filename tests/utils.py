@@ -0,0 +1,11 @@
+class FakeClock:
+    """可手动推进的单调时钟"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds